@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Generate timestamped POS events for Dose - Coffee Shop Edition
+This script emits intraday order, line item and refund events as NDJSON and can
+replay them into a local sink (stdout, a file or a local Dose API) to load test ingestion
+
+Usage:
+    # Dump one week of events as NDJSON (no pacing)
+    python3 scripts/generate_pos_events.py --start 2025-03-03 --days 7 > events.ndjson
+
+    # Replay one day 60x faster than real time into a file
+    python3 scripts/generate_pos_events.py --days 1 --replay --speed 60 --sink file:/tmp/pos.ndjson
+
+    # Replay a 20x busier day at 10x speed against a local instance, 8 requests in flight
+    python3 scripts/generate_pos_events.py --days 1 --scale 20 --replay --speed 10 \\
+        --concurrency 8 --sink api:http://localhost:3000
+
+Replay prints a throughput / latency summary to stderr when it finishes or is
+interrupted with Ctrl-C. When paced, latency is measured from each event's
+scheduled time, so requests delayed by a slow sink count towards the tail.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Same daily volumes as generate_sales() in generate_seed_data.py
+WEEKDAY_ORDERS = 7
+WEEKEND_ORDERS = 5
+HOLIDAY_FACTOR = 1.3
+
+VAT_RATE = 19.0
+
+SALES_TYPES = ['on_site', 'takeaway', 'delivery']
+SALES_TYPE_WEIGHTS = [5, 3, 2]
+
+MENU = [
+    ('Espresso', 2.50),
+    ('Double Espresso', 3.50),
+    ('Cappuccino', 4.00),
+    ('Latte', 4.50),
+    ('Flat White', 4.20),
+    ('Americano', 3.00),
+    ('Iced Latte', 5.00),
+    ('Hot Chocolate', 3.80),
+    ('Croissant', 2.50),
+    ('Muffin', 3.00),
+    ('Bagel', 2.80),
+    ('Sandwich', 7.50),
+]
+
+REFUND_REASONS = ['wrong_order', 'quality', 'customer_request', 'duplicate_charge']
+
+# Hourly weights (0-23) describing how a day's orders spread over time
+CURVES = {
+    'coffee': {
+        7: 8, 8: 14, 9: 10, 10: 6, 11: 6, 12: 10,
+        13: 9, 14: 5, 15: 5, 16: 6, 17: 5, 18: 3, 19: 2,
+    },
+    'flat': {hour: 1 for hour in range(7, 20)},
+}
+
+
+def parse_curve(value):
+    """Parse a preset name or an 'hour:weight,...' list into hourly weights"""
+    if value in CURVES:
+        return CURVES[value]
+
+    curve = {}
+    for part in value.split(','):
+        try:
+            hour, weight = part.split(':')
+            hour, weight = int(hour), float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid curve entry '{part}', expected hour:weight")
+        if not 0 <= hour <= 23 or weight < 0:
+            raise argparse.ArgumentTypeError(f"Invalid curve entry '{part}'")
+        curve[hour] = weight
+
+    if not any(curve.values()):
+        raise argparse.ArgumentTypeError('Curve must have at least one positive weight')
+    return curve
+
+
+def parse_speed(value):
+    """Parse a replay speed: 'max' (no pacing) or a positive multiplier"""
+    if value == 'max':
+        return None
+    try:
+        speed = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid speed '{value}', expected a number or 'max'")
+    if speed <= 0:
+        raise argparse.ArgumentTypeError('Speed must be positive')
+    return speed
+
+
+def orders_for_day(day, scale):
+    """Number of orders on a given day, following the seed data weekday/weekend/holiday pattern"""
+    is_weekend = day.weekday() >= 5
+    is_holiday = day.month == 12 and day.day >= 20
+
+    num_orders = WEEKEND_ORDERS if is_weekend else WEEKDAY_ORDERS
+    if is_holiday:
+        num_orders *= HOLIDAY_FACTOR
+    return max(0, round(num_orders * scale))
+
+
+def generate_day_events(day, num_orders, curve, refund_rate, rng, next_order_id):
+    """Generate the events of a single day, sorted by timestamp"""
+    hours = [hour for hour, weight in curve.items() if weight > 0]
+    weights = [curve[hour] for hour in hours]
+    midnight = datetime.datetime.combine(day, datetime.time(), tzinfo=datetime.timezone.utc)
+
+    # Draw every order time up front so order ids increase through the day
+    order_times = sorted(
+        midnight + datetime.timedelta(hours=hour, seconds=rng.uniform(0, 3600))
+        for hour in rng.choices(hours, weights, k=num_orders)
+    )
+
+    events = []
+    for order_id, ts in enumerate(order_times, start=next_order_id):
+        sale_type = rng.choices(SALES_TYPES, SALES_TYPE_WEIGHTS)[0]
+
+        lines = []
+        for index in range(rng.choices([1, 2, 3, 4], [5, 3, 2, 1])[0]):
+            name, price = rng.choice(MENU)
+            quantity = rng.choices([1, 2, 3], [8, 2, 1])[0]
+            lines.append({
+                'event': 'line_item',
+                'ts': ts,
+                'order_id': order_id,
+                'line_index': index,
+                'name': name,
+                'quantity': quantity,
+                'unit_price': price,
+                'tax_rate_percent': VAT_RATE,
+            })
+
+        subtotal = round(sum(line['quantity'] * line['unit_price'] for line in lines), 2)
+        total_tax = round(subtotal * VAT_RATE / 100, 2)
+        events.append({
+            'event': 'order',
+            'ts': ts,
+            'order_id': order_id,
+            'type': sale_type,
+            'line_count': len(lines),
+            'subtotal': subtotal,
+            'total_tax': total_tax,
+            'total': round(subtotal + total_tax, 2),
+        })
+        events.extend(lines)
+
+        if rng.random() < refund_rate:
+            refunded = rng.choice(lines)
+            amount = refunded['unit_price'] * (1 + VAT_RATE / 100)
+            events.append({
+                'event': 'refund',
+                'ts': ts + datetime.timedelta(minutes=rng.uniform(2, 45)),
+                'order_id': order_id,
+                'line_index': refunded['line_index'],
+                'amount': round(amount, 2),
+                'reason': rng.choice(REFUND_REASONS),
+            })
+
+    # Stable sort keeps each order header ahead of its line items
+    events.sort(key=lambda event: event['ts'])
+    return events
+
+
+def generate_events(start_date, days, scale=1.0, curve=None, refund_rate=0.02, seed=None):
+    """Yield POS events day by day in timestamp order"""
+    curve = curve or CURVES['coffee']
+    rng = random.Random(seed)
+    event_id = 1
+    order_id = 1
+    # Late refunds can fall after midnight; hold them back for the next day's batch
+    carried = []
+
+    for offset in range(days + 1):
+        day = start_date + datetime.timedelta(days=offset)
+        if offset < days:
+            num_orders = orders_for_day(day, scale)
+            batch = generate_day_events(day, num_orders, curve, refund_rate, rng, order_id)
+            order_id += num_orders
+        else:
+            batch = []
+
+        next_midnight = datetime.datetime.combine(
+            day + datetime.timedelta(days=1), datetime.time(), tzinfo=datetime.timezone.utc
+        )
+        batch = sorted(carried + batch, key=lambda event: event['ts'])
+        carried = [event for event in batch if event['ts'] >= next_midnight]
+        for event in batch:
+            if event['ts'] >= next_midnight:
+                continue
+            event['event_id'] = event_id
+            event_id += 1
+            yield event
+
+
+def event_to_json(event):
+    """Serialize an event as a single NDJSON line"""
+    return json.dumps({**event, 'ts': event['ts'].isoformat()}, separators=(',', ':'))
+
+
+class StreamSink:
+    """
+    Write events as NDJSON to a text stream (stdout or a file).
+    Lines are written in order from the replay thread; flush_each pushes every
+    line out immediately, which only matters when pacing.
+    """
+
+    ordered = True
+
+    def __init__(self, stream, flush_each=False):
+        self.stream = stream
+        self.flush_each = flush_each
+        self.skipped = 0
+
+    def prepare(self, event):
+        return event_to_json(event) + '\n'
+
+    def deliver(self, line):
+        self.stream.write(line)
+        if self.flush_each:
+            self.stream.flush()
+        return True
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class ApiSink:
+    """
+    POST orders to a local Dose instance via /api/sales.
+    An order is sent once all of its line items have been seen; refunds are
+    skipped because the API has no refund endpoint.
+    """
+
+    ordered = False
+
+    def __init__(self, base_url, timeout=10.0):
+        self.url = base_url.rstrip('/') + '/api/sales'
+        self.timeout = timeout
+        self.pending = {}
+        self.dropped = 0
+
+    @property
+    def skipped(self):
+        """Refunds and unmatched line items, plus orders still waiting on line items"""
+        return self.dropped + len(self.pending)
+
+    def prepare(self, event):
+        """Collect an order's line items and return its payload once complete"""
+        if event['event'] == 'order':
+            self.pending[event['order_id']] = (event, [])
+            return None
+        if event['event'] != 'line_item' or event['order_id'] not in self.pending:
+            self.dropped += 1
+            return None
+
+        order, lines = self.pending[event['order_id']]
+        lines.append(event)
+        if len(lines) < order['line_count']:
+            return None
+        del self.pending[event['order_id']]
+
+        return {
+            'date': order['ts'].isoformat(),
+            'type': order['type'],
+            'description': f"POS order {order['order_id']}",
+            'lineItems': [
+                {
+                    'quantity': line['quantity'],
+                    'unitPrice': line['unit_price'],
+                    'taxRatePercent': line['tax_rate_percent'],
+                }
+                for line in lines
+            ],
+        }
+
+    def deliver(self, payload):
+        """POST a sale transaction, returning whether the API accepted it"""
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as error:
+            body = error.read().decode('utf-8', errors='replace')
+            print(f"-- Failed to post {payload['description']}: HTTP {error.code} {body}", file=sys.stderr)
+            return False
+        except OSError as error:
+            print(f"-- Failed to post {payload['description']}: {error}", file=sys.stderr)
+            return False
+        return True
+
+    def close(self):
+        """Nothing to release, urllib opens a connection per request"""
+
+
+def open_sink(spec, flush_each=False):
+    """Build a sink from 'stdout', 'file:PATH' or 'api:BASE_URL'"""
+    if spec == 'stdout':
+        return StreamSink(sys.stdout, flush_each)
+    if spec.startswith('file:'):
+        return StreamSink(open(spec[len('file:'):], 'w', encoding='utf-8'), flush_each)
+    if spec.startswith('api:'):
+        return ApiSink(spec[len('api:'):])
+    raise ValueError(f"Unknown sink '{spec}', expected stdout, file:PATH or api:BASE_URL")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(sorted_latencies):
+    """p50 / p95 / p99 / max of sorted latencies in milliseconds"""
+    return {
+        'p50': round(percentile(sorted_latencies, 50) * 1000, 3),
+        'p95': round(percentile(sorted_latencies, 95) * 1000, 3),
+        'p99': round(percentile(sorted_latencies, 99) * 1000, 3),
+        'max': round(sorted_latencies[-1] * 1000, 3) if sorted_latencies else 0.0,
+    }
+
+
+def replay(events, sink, speed=None, concurrency=1):
+    """
+    Stream events into a sink with up to `concurrency` deliveries in flight,
+    pacing them by their timestamps divided by speed (None replays as fast as
+    possible). Ordered sinks are delivered inline, one at a time. Returns
+    throughput and latency stats, also when interrupted.
+    """
+    if sink.ordered:
+        concurrency = 1
+    latencies = []
+    error_latencies = []
+    failures = []
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(concurrency)
+    max_lag = 0.0
+    count = 0
+    interrupted = False
+    first_ts = None
+
+    def deliver(item, start):
+        try:
+            accepted = sink.deliver(item)
+            latency = time.perf_counter() - start
+            with lock:
+                (latencies if accepted else error_latencies).append(latency)
+        except Exception as error:
+            failures.append(error)
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for event in events:
+            if failures:
+                raise failures[0]
+            count += 1
+            item = sink.prepare(event)
+
+            if speed is None:
+                if item is None:
+                    continue
+                slots.acquire()
+                start = time.perf_counter()
+            else:
+                if first_ts is None:
+                    first_ts = event['ts']
+                # Time from the schedule, so waiting on a slow sink counts as latency
+                start = started + (event['ts'] - first_ts).total_seconds() / speed
+                delay = start - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+                if item is None:
+                    continue
+                slots.acquire()
+
+            if sink.ordered:
+                deliver(item, start)
+            else:
+                executor.submit(deliver, item, start)
+        executor.shutdown(wait=True)
+    except KeyboardInterrupt:
+        # Don't wait on in-flight deliveries, report what has completed so far
+        interrupted = True
+        executor.shutdown(wait=False, cancel_futures=True)
+    if failures:
+        raise failures[0]
+
+    elapsed = time.perf_counter() - started
+    with lock:
+        latencies = sorted(latencies)
+        error_latencies = sorted(error_latencies)
+    stats = {
+        'events': count,
+        'requests': len(latencies),
+        'errors': len(error_latencies),
+        'skipped': sink.skipped,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'events_per_s': round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        'requests_per_s': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_ms': latency_summary(latencies),
+        'max_lag_s': round(max_lag, 3),
+    }
+    if error_latencies:
+        stats['error_latency_ms'] = latency_summary(error_latencies)
+    if interrupted:
+        stats['interrupted'] = True
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate and replay timestamped POS events')
+    parser.add_argument('--start', type=datetime.date.fromisoformat, default=datetime.date(2025, 1, 6),
+                        help='First day to generate (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=1, help='Number of days to generate')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiplier on the seed data daily order counts (7 weekdays, 5 weekends)')
+    parser.add_argument('--curve', type=parse_curve, default=CURVES['coffee'],
+                        help="Intraday curve: 'coffee', 'flat' or 'hour:weight,...' (e.g. '8:5,12:3,17:2')")
+    parser.add_argument('--refund-rate', type=float, default=0.02, help='Share of orders that get a refund')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible streams')
+    parser.add_argument('--replay', action='store_true', help='Pace events by timestamp and report stats')
+    parser.add_argument('--speed', type=parse_speed, default=1.0,
+                        help="Replay speed multiplier (1 = real time) or 'max'")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Maximum number of deliveries in flight during replay')
+    parser.add_argument('--sink', default='stdout', help='stdout, file:PATH or api:BASE_URL')
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.concurrency > 1 and not args.sink.startswith('api:'):
+        parser.error('--concurrency only applies to the api: sink, NDJSON output is written in order')
+
+    events = generate_events(args.start, args.days, args.scale, args.curve, args.refund_rate, args.seed)
+    try:
+        sink = open_sink(args.sink, flush_each=args.replay and args.speed is not None)
+    except (ValueError, OSError) as error:
+        parser.error(str(error))
+
+    try:
+        if args.replay:
+            stats = replay(events, sink, args.speed, args.concurrency)
+            print(json.dumps(stats, indent=2), file=sys.stderr)
+            if stats.get('interrupted'):
+                # Skip joining abandoned in-flight requests at interpreter exit
+                sink.close()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(130)
+        else:
+            for event in events:
+                item = sink.prepare(event)
+                if item is not None:
+                    sink.deliver(item)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); silence the final flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        sink.close()
+
+
+if __name__ == '__main__':
+    main()